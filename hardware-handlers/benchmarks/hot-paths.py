@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""Benchmark the hardware server's hot paths on simulated hardware.
+
+    python3 benchmarks/hot-paths.py --save-baseline  # record a baseline on this machine
+    python3 benchmarks/hot-paths.py                  # compare against it
+
+Covers keypad scanning, broadcast fan-out, JSON encoding and decoding of
+every event type, handle_client command dispatch and ringtone start/stop
+against a silent stand-in player. Results are written as JSON; the run
+fails if any benchmark is slower than the stored baseline by more than the
+tolerance.
+
+Timings are only comparable on the machine that recorded them, so the
+baseline is tagged with its host. Record the baseline on the Pi itself;
+none is checked in. Without a baseline from this host the run exits with
+EXIT_NO_BASELINE (3) rather than passing silently, unless
+--allow-missing-baseline is given; regressions exit with EXIT_REGRESSION (1).
+"""
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation import gpio
+from simulation.server import load_server
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, "baseline.json")
+
+# Rounds of micro-benchmarks; each benchmark keeps its fastest round
+REPEATS = 50
+
+# Exit codes: a regression, or no baseline recorded on this host to compare with
+EXIT_REGRESSION = 1
+EXIT_NO_BASELINE = 3
+
+# 100 ms of 24 kHz PCM16 mono, the size of a typical realtime API audio delta
+AUDIO_DELTA = base64.b64encode(bytes(range(256)) * 18 + bytes(192)).decode()
+
+# One representative message per event type sent or received by the server
+EVENTS = {
+    "handset_state": {"event": "handset_state", "state": "up"},
+    "led_state": {"event": "led_state", "state": "on"},
+    "keypad_press": {"event": "keypad_press", "key": "5"},
+    "ringtone_stopped": {"event": "ringtone_stopped", "reason": "handset_pickup"},
+    "hook_flash": {"event": "hook_flash"},
+    "pulse_digit": {"event": "pulse_digit", "digit": "7"},
+    "ai_realtime_client_message": {"event": "ai_realtime_client_message", "data": "Handset down"},
+    "state_snapshot": {
+        "event": "state_snapshot", "handset": "up", "led": "on",
+        "ringtone": {"playing": False, "name": None}, "last_key": "5"
+    },
+    "ring": {"event": "ring", "ringtone": "telephone-ring-02.wav"},
+    "open_ai_realtime_client_message": {
+        "event": "open_ai_realtime_client_message", "message": "Started playing welcome message"
+    },
+    "audio_chunk": {"event": "audio_chunk", "audio": AUDIO_DELTA},
+    "metrics": {
+        "event": "metrics", "clients": 2,
+        "watchdog": {
+            "max_lag_ms": 12.4, "bucket_bounds_ms": [100, 250, 500, 1000, 2500, 5000],
+            "stalls": {
+                "socket-server.py:play_ringtone": {
+                    "count": 3, "total_ms": 412.7, "max_ms": 180.2, "buckets": [2, 1, 0, 0, 0, 0, 0]
+                }
+            }
+        },
+        "hardware": {
+            name: {"runs": 120000, "p50_ms": 0.061, "p99_ms": 0.42, "max_ms": 3.1}
+            for name in ("handset", "keypad", "hook_gestures")
+        },
+        "audio": {
+            "underruns": 1, "fill_bytes": 9600, "fill_ratio": 0.04, "playing": True,
+            "dropped_bytes": 0, "worker_alive": True
+        }
+    },
+    "profile_result": {
+        "event": "profile_result", "samples": 1000, "rate": 100, "elapsed": 10.002,
+        "collapsed": "\n".join(
+            f"MainThread;task:Task-{i};socket-server.py:handle_client;socket-server.py:broadcast_event;"
+            f"protocol.py:send;selector_events.py:write {1000 - i * 9}"
+            for i in range(100)
+        ),
+        "tasks": {f"task:Task-{i}": 1000 - i * 9 for i in range(100)}
+    }
+}
+
+# Commands replayed through handle_client for the dispatch benchmark
+DISPATCH_COMMANDS = [
+    json.dumps({"event": "get_state"}),
+    json.dumps({"event": "led_on"}),
+    json.dumps({"event": "open_ai_realtime_client_message", "message": "Recording started"}),
+    json.dumps({"event": "led_off"})
+]
+
+
+class StandInClient:
+    """Websocket stand-in that accepts sends and replays a fixed list of messages."""
+
+    remote_address = ("127.0.0.1", 0)
+
+    def __init__(self, messages=()):
+        self.messages = messages
+        self.sent = 0
+
+    async def send(self, message):
+        self.sent += 1
+
+    async def wait_closed(self):
+        pass
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for message in self.messages:
+            yield message
+
+
+def timed(fn, count: int) -> float:
+    """Run fn count times and return the seconds per call."""
+    start = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return (time.perf_counter() - start) / count
+
+
+async def timed_async(fn, count: int) -> float:
+    """Async version of timed."""
+    start = time.perf_counter()
+    for _ in range(count):
+        await fn()
+    return (time.perf_counter() - start) / count
+
+
+async def best_of(cases: dict) -> dict:
+    """Time every case once per round for REPEATS rounds and keep each case's best.
+
+    Each case is a callable (or coroutine function) returning seconds per
+    call for one batch. Interleaving the cases spreads each one's samples
+    over the whole run, so a slow patch on a busy machine can't inflate
+    every sample of whichever benchmark happened to be running.
+    """
+    best = dict.fromkeys(cases, float("inf"))
+    for _ in range(REPEATS):
+        for name, case in cases.items():
+            seconds = case()
+            if asyncio.iscoroutine(seconds):
+                seconds = await seconds
+            best[name] = min(best[name], seconds)
+    return {name: result(seconds) for name, seconds in best.items()}
+
+
+def host_info() -> dict:
+    """Identify the machine and interpreter the benchmarks ran on."""
+    return {
+        "node": platform.node(),
+        "machine": platform.machine(),
+        "python": platform.python_version()
+    }
+
+
+def result(seconds: float) -> dict:
+    """A lower-is-better timing in microseconds."""
+    return {"value": round(seconds * 1e6, 3), "unit": "us"}
+
+
+def bench_keypad(server) -> dict:
+    """Cost of one keypad matrix scan with no key and with a key held."""
+    keypad = server.Keypad()
+
+    def pressed():
+        gpio.press_key("9")
+        try:
+            return timed(keypad.read_key, 200)
+        finally:
+            gpio.release_keys()
+
+    return {
+        "keypad_scan_idle": lambda: timed(keypad.read_key, 200),
+        "keypad_scan_pressed": pressed
+    }
+
+
+def bench_broadcast(server) -> dict:
+    """Cost of broadcast_event fanning out to 1, 10 and 100 clients."""
+    def fan_out(clients):
+        async def case():
+            server.connected_clients.clear()
+            server.connected_clients.update(clients)
+            try:
+                return await timed_async(lambda: server.broadcast_event("keypad_press", {"key": "5"}), 50)
+            finally:
+                server.connected_clients.clear()
+        return case
+
+    return {
+        f"broadcast_{count}_clients": fan_out([StandInClient() for _ in range(count)])
+        for count in (1, 10, 100)
+    }
+
+
+def bench_json() -> dict:
+    """Cost of encoding and decoding each event type."""
+    cases = {}
+    for name, event in EVENTS.items():
+        encoded = json.dumps(event)
+        cases[f"json_encode_{name}"] = lambda event=event: timed(lambda: json.dumps(event), 500)
+        cases[f"json_decode_{name}"] = lambda encoded=encoded: timed(lambda: json.loads(encoded), 500)
+    return cases
+
+
+def bench_dispatch(server, handset, keypad, led, speaker) -> dict:
+    """Cost per command of handle_client parsing and dispatching inbound messages."""
+    count = 400
+    messages = DISPATCH_COMMANDS * (count // len(DISPATCH_COMMANDS))
+
+    async def run():
+        client = StandInClient(messages)
+        await server.handle_client(client, handset, keypad, led, speaker)
+
+    async def case():
+        return await timed_async(run, 1) / len(messages)
+
+    return {"handle_client_dispatch": case}
+
+
+async def bench_ringtone(server, speaker) -> dict:
+    """Median latency of starting and stopping a ringtone with the stand-in player.
+
+    Process spawn time varies a lot from run to run, so the median is more
+    stable here than the best run.
+    """
+    start_times = []
+    stop_times = []
+    for _ in range(20):
+        start = time.perf_counter()
+        await server.play_ringtone(speaker, "telephone-ring-02.wav")
+        start_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await server.stop_ringtone()
+        stop_times.append(time.perf_counter() - start)
+        await asyncio.sleep(0.05)  # Let the monitor task reap the process
+    return {
+        "ringtone_start": result(statistics.median(start_times)),
+        "ringtone_stop": result(statistics.median(stop_times))
+    }
+
+
+async def run_benchmarks() -> dict:
+    """Run every benchmark against a freshly loaded simulated server."""
+    server = load_server()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    server.hardware.start()
+    handset = await server.hardware.submit(server.Handset)
+    keypad = await server.hardware.submit(server.Keypad)
+    led = await server.hardware.submit(server.GpioLED)
+    speaker = server.Speaker()
+
+    cases = {
+        **bench_keypad(server),
+        **bench_broadcast(server),
+        **bench_json(),
+        **bench_dispatch(server, handset, keypad, led, speaker)
+    }
+    try:
+        results = await best_of(cases)
+        results.update(await bench_ringtone(server, speaker))
+    finally:
+        server.hardware.stop()
+        if server.current_ringtone_process:
+            server.current_ringtone_process.kill()
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return a description of every benchmark slower than baseline by more than tolerance."""
+    regressions = []
+    for name, entry in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]["value"]
+        change = entry["value"] / expected - 1
+        if change > tolerance:
+            regressions.append(f"{name}: {entry['value']}{entry['unit']} "
+                               f"vs baseline {expected}{entry['unit']} (+{change * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hardware server hot paths.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    parser.add_argument("--allow-missing-baseline", action="store_true",
+                        help="Exit successfully when there is no baseline from this host to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.35,
+                        help="Allowed slowdown before a benchmark counts as a regression (default: 0.35)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks())
+    report = {"host": host_info(), "benchmarks": results}
+
+    for name, entry in results.items():
+        print(f"{name:45s} {entry['value']:12.3f} {entry['unit']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline first")
+        sys.exit(0 if args.allow_missing_baseline else EXIT_NO_BASELINE)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("host") != report["host"]:
+        print(f"\nBaseline was recorded on {baseline.get('host')}, not {report['host']}; "
+              f"run with --save-baseline on this machine first")
+        sys.exit(0 if args.allow_missing_baseline else EXIT_NO_BASELINE)
+
+    regressions = compare(results, baseline["benchmarks"], args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance * 100:.0f}%:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(EXIT_REGRESSION)
+    print(f"\nNo regressions beyond {args.tolerance * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Compare per-message latency and CPU cost of TCP loopback vs the Unix socket.
+
+By default a server is started in a child process on simulated hardware.
+To measure the real server on the Pi instead (started with
+AI_PHONE_UNIX_SOCKET set), point the benchmark at it:
+
+    python3 benchmarks/transport-latency.py --port 8765 \
+        --socket /run/ai-phone/hardware.sock --pid $(pgrep -f socket-server.py)
+
+Each round trip sends a get_state command and waits for the state_snapshot
+reply. Client CPU is measured in this process; server CPU is read from
+/proc/<pid>/stat.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import websockets
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REQUEST = json.dumps({"event": "get_state"})
+
+
+def server_cpu_seconds(pid: int) -> float:
+    """Return user + system CPU time consumed so far by a process."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def run_transport(connect, count: int, pid: int) -> dict:
+    """Time count get_state round trips over one connection."""
+    async with connect() as ws:
+        await ws.recv()  # Initial state_snapshot
+        for _ in range(min(100, count)):  # Warm up
+            await ws.send(REQUEST)
+            await ws.recv()
+
+        latencies = []
+        client_cpu = time.process_time()
+        server_cpu = server_cpu_seconds(pid)
+        for _ in range(count):
+            start = time.perf_counter()
+            await ws.send(REQUEST)
+            await ws.recv()
+            latencies.append(time.perf_counter() - start)
+        client_cpu = time.process_time() - client_cpu
+        server_cpu = server_cpu_seconds(pid) - server_cpu
+
+    latencies.sort()
+    return {
+        "messages": count,
+        "p50_us": round(latencies[len(latencies) // 2] * 1e6, 1),
+        "p99_us": round(latencies[int(len(latencies) * 0.99)] * 1e6, 1),
+        "mean_us": round(sum(latencies) / count * 1e6, 1),
+        "client_cpu_us_per_msg": round(client_cpu / count * 1e6, 1),
+        "server_cpu_us_per_msg": round(server_cpu / count * 1e6, 1)
+    }
+
+
+async def benchmark(port: int, path: str, count: int, pid: int) -> dict:
+    """Run the round-trip benchmark over TCP and then over the Unix socket."""
+    return {
+        "tcp": await run_transport(lambda: websockets.connect(f"ws://127.0.0.1:{port}"), count, pid),
+        "unix": await run_transport(lambda: websockets.unix_connect(path), count, pid)
+    }
+
+
+def serve(port: int, path: str):
+    """Child process: run the server on simulated hardware."""
+    from simulation.server import load_server
+    server = load_server()
+    server.UNIX_SOCKET_PATH = path
+    asyncio.run(server.main(host="127.0.0.1", port=port))
+
+
+def start_server(port: int, path: str) -> subprocess.Popen:
+    """Start a simulated server and wait for both listeners to come up."""
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port), "--socket", path],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 15
+    while not os.path.exists(path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError("Simulated server failed to start")
+        time.sleep(0.05)
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TCP loopback against the Unix domain socket.")
+    parser.add_argument("--count", type=int, default=5000, help="Round trips per transport")
+    parser.add_argument("--port", type=int, default=18765, help="TCP port of the server")
+    parser.add_argument("--socket", help="Unix socket path of the server")
+    parser.add_argument("--pid", type=int, help="PID of an already running server to measure")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.socket)
+        return
+
+    process = None
+    path = args.socket
+    pid = args.pid
+    if pid is None:
+        path = path or os.path.join(tempfile.mkdtemp(), "hardware.sock")
+        process = start_server(args.port, path)
+        pid = process.pid
+
+    try:
+        results = asyncio.run(benchmark(args.port, path, args.count, pid))
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'':6s} {'p50 us':>8s} {'p99 us':>8s} {'mean us':>8s} {'client CPU/msg':>15s} {'server CPU/msg':>15s}")
+    for name, r in results.items():
+        print(f"{name:6s} {r['p50_us']:8.1f} {r['p99_us']:8.1f} {r['mean_us']:8.1f} "
+              f"{r['client_cpu_us_per_msg']:13.1f}us {r['server_cpu_us_per_msg']:13.1f}us")
+
+
+if __name__ == "__main__":
+    main()
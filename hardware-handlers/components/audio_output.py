@@ -0,0 +1,227 @@
+import logging
+import multiprocessing
+import subprocess
+import time
+from multiprocessing import shared_memory
+from typing import Optional
+
+logger = logging.getLogger('AudioOutput')
+
+# PCM format of the OpenAI realtime API audio deltas
+SAMPLE_RATE = 24000
+CHANNELS = 1
+SAMPLE_WIDTH = 2  # S16_LE
+
+
+class RingBuffer:
+    # Header: total bytes written, total bytes read, reader underruns and
+    # reader playing flag (all unsigned 64-bit). The reader's counters live
+    # here so the writer can read them at any time without a message channel.
+    HEADER_SIZE = 32
+
+    def __init__(self, capacity: int = 0, name: Optional[str] = None):
+        """Create a new shared-memory ring buffer, or attach to an existing one by name.
+
+        Only one process may write and only one may read.
+        """
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.HEADER_SIZE + capacity)
+            self.shm.buf[:self.HEADER_SIZE] = bytes(self.HEADER_SIZE)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.capacity = self.shm.size - self.HEADER_SIZE
+        self._positions = self.shm.buf[:self.HEADER_SIZE].cast("Q")
+        self._data = self.shm.buf[self.HEADER_SIZE:self.HEADER_SIZE + self.capacity]
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def underruns(self) -> int:
+        """Times the reader ran dry mid-stream. Only the reading side may set it."""
+        return self._positions[2]
+
+    @underruns.setter
+    def underruns(self, count: int):
+        self._positions[2] = count
+
+    @property
+    def playing(self) -> bool:
+        """Whether the reader is currently playing. Only the reading side may set it."""
+        return bool(self._positions[3])
+
+    @playing.setter
+    def playing(self, playing: bool):
+        self._positions[3] = int(playing)
+
+    def fill(self) -> int:
+        """Number of bytes written but not yet read."""
+        return self._positions[0] - self._positions[1]
+
+    def write(self, data: bytes) -> int:
+        """Copy as much of data as fits and return the number of bytes written."""
+        write_pos = self._positions[0]
+        count = min(len(data), self.capacity - (write_pos - self._positions[1]))
+        start = write_pos % self.capacity
+        first = min(count, self.capacity - start)
+        self._data[start:start + first] = data[:first]
+        self._data[:count - first] = data[first:count]
+        # Publish only after the bytes are in place
+        self._positions[0] = write_pos + count
+        return count
+
+    def read(self, size: int) -> bytes:
+        """Return up to size bytes."""
+        read_pos = self._positions[1]
+        count = min(size, self._positions[0] - read_pos)
+        start = read_pos % self.capacity
+        first = min(count, self.capacity - start)
+        data = bytes(self._data[start:start + first]) + bytes(self._data[:count - first])
+        self._positions[1] = read_pos + count
+        return data
+
+    def discard(self):
+        """Drop everything not yet read. Only call from the reading side."""
+        self._positions[1] = self._positions[0]
+
+    def close(self):
+        """Detach from the shared memory."""
+        self._positions.release()
+        self._data.release()
+        self.shm.close()
+
+
+def _audio_worker(ring_name: str, conn, player: list[str], period_bytes: int, prebuffer_bytes: int):
+    """Worker process: feed PCM from the ring buffer to the player.
+
+    Playback starts once prebuffer_bytes are queued. Running dry while a
+    stream is playing counts as an underrun unless the server has signalled
+    the end of the stream. Underruns and the playing flag are published in
+    the ring buffer header; the worker never writes to conn, so it can't
+    block on the server not reading.
+    """
+    ring = RingBuffer(name=ring_name)
+    process = subprocess.Popen(player, stdin=subprocess.PIPE)
+    playing = False
+    ended = False
+
+    try:
+        while True:
+            while conn.poll():
+                command = conn.recv()
+                if command == "shutdown":
+                    return
+                elif command == "stop":
+                    ring.discard()
+                    playing = False
+                    ended = False
+                elif command == "end":
+                    # An end that arrives after its stream already drained is
+                    # stale and must not hide the next stream's underruns
+                    ended = playing or ring.fill() > 0
+
+            if playing:
+                chunk = ring.read(period_bytes)
+                if chunk:
+                    # Blocks while the device buffer is full, which paces the loop
+                    process.stdin.write(chunk)
+                    process.stdin.flush()
+                else:
+                    if not ended:
+                        ring.underruns += 1
+                    playing = False
+                    ended = False
+            elif ring.fill() >= prebuffer_bytes or (ended and ring.fill()):
+                playing = True
+            else:
+                time.sleep(0.005)
+            ring.playing = playing
+    finally:
+        process.stdin.close()
+        process.terminate()
+        ring.close()
+
+
+class AudioOutput:
+    def __init__(self, card_number: int = 2, buffer_seconds: float = 5.0,
+                 period_ms: int = 20, prebuffer_ms: int = 200):
+        """Initialize an audio output that plays PCM from a separate worker process.
+
+        Args:
+            card_number (int, optional): Audio card number. Defaults to 2.
+            buffer_seconds (float, optional): Ring buffer size in seconds of audio. Defaults to 5.0.
+            period_ms (int, optional): Size of each write to the player. Defaults to 20.
+            prebuffer_ms (int, optional): Audio queued before playback starts. Defaults to 200.
+        """
+        bytes_per_ms = SAMPLE_RATE * CHANNELS * SAMPLE_WIDTH // 1000
+        self.player = [
+            'aplay', '-q',
+            '-D', f'plughw:{card_number},0',
+            '-t', 'raw', '-f', 'S16_LE',
+            '-r', str(SAMPLE_RATE), '-c', str(CHANNELS)
+        ]
+        self.capacity = int(buffer_seconds * 1000) * bytes_per_ms
+        self.period_bytes = period_ms * bytes_per_ms
+        self.prebuffer_bytes = prebuffer_ms * bytes_per_ms
+        self.dropped_bytes = 0
+        self.ring: Optional[RingBuffer] = None
+        self._conn = None
+        self._process: Optional[multiprocessing.Process] = None
+
+    def start(self):
+        """Create the ring buffer and start the worker process.
+
+        Call this before starting any threads: the worker is forked.
+        """
+        self.ring = RingBuffer(self.capacity)
+        self._conn, worker_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_audio_worker,
+            args=(self.ring.name, worker_conn, self.player, self.period_bytes, self.prebuffer_bytes),
+            name="audio-worker",
+            daemon=True
+        )
+        self._process.start()
+        logger.info(f"Audio worker started (pid {self._process.pid})")
+
+    def write(self, pcm: bytes) -> int:
+        """Queue PCM for playback and return how many bytes fitted in the buffer."""
+        written = self.ring.write(pcm)
+        if written < len(pcm):
+            self.dropped_bytes += len(pcm) - written
+            logger.warning(f"Audio buffer full, dropped {len(pcm) - written} bytes")
+        return written
+
+    def end(self):
+        """Mark the end of the current stream so draining the buffer is not an underrun."""
+        self._conn.send("end")
+
+    def stop(self):
+        """Discard queued audio and stop playback."""
+        self._conn.send("stop")
+
+    def close(self):
+        """Stop the worker process and free the shared memory."""
+        if self._process:
+            self._conn.send("shutdown")
+            self._process.join(timeout=2)
+            if self._process.is_alive():
+                self._process.kill()
+            self._process = None
+        if self.ring:
+            self.ring.close()
+            self.ring.shm.unlink()
+            self.ring = None
+
+    def stats(self) -> dict:
+        """Return playback metrics, read straight from the ring buffer header."""
+        fill = self.ring.fill() if self.ring else 0
+        return {
+            "underruns": self.ring.underruns if self.ring else 0,
+            "fill_bytes": fill,
+            "fill_ratio": round(fill / self.capacity, 3),
+            "playing": self.ring.playing if self.ring else False,
+            "dropped_bytes": self.dropped_bytes,
+            "worker_alive": self._process is not None and self._process.is_alive()
+        }
@@ -4,12 +4,24 @@ import os
 import asyncio
 from typing import Callable, Optional
 
+# Default GPIO pin of the hook switch
+HANDSET_PIN = 18
+
 class Handset:
-    def __init__(self, gpio_pin: int = 18):
-        """Initialize the handset monitor with a customizable GPIO pin."""
+    # Sampled fast enough to time hook-flashes and pulse dialing
+    POLL_INTERVAL = 0.005
+    # A new reading must hold this long before it counts as an edge
+    DEBOUNCE_TIME = 0.01
+    
+    def __init__(self, gpio_pin: int = HANDSET_PIN, poll_interval: Optional[float] = None):
+        """Initialize the handset monitor with a customizable GPIO pin and poll interval."""
         self.gpio_pin = gpio_pin
+        self.poll_interval = poll_interval or self.POLL_INTERVAL
         self.last_state = None
+        self._reading = None
+        self._reading_since = 0.0
         self._callback: Optional[Callable[[bool], None]] = None
+        self._edge_callback: Optional[Callable[[float, bool], None]] = None
         
         # Set up pin as input with pull-down resistor
         GPIO.setup(self.gpio_pin, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
@@ -18,20 +30,40 @@ class Handset:
         """Set a callback function to be called when handset state changes."""
         self._callback = callback
     
+    def set_edge_callback(self, callback: Callable[[float, bool], None]):
+        """Set a callback function to be called with (timestamp, state) for every edge.
+        
+        The timestamp is the time.monotonic() at which the new state was first read.
+        """
+        self._edge_callback = callback
+    
     def get_state(self) -> bool:
         """Get the current state of the handset (True = down, False = up)."""
         return GPIO.input(self.gpio_pin)
     
-    async def monitor(self):
-        """Monitor handset position and trigger callback if state changes."""
+    def poll(self) -> float:
+        """Read the handset once, trigger callback if state changed, and return the delay before the next read."""
+        now = time.monotonic()
         current_state = self.get_state()
         
-        if current_state != self.last_state:
+        if current_state != self._reading:
+            self._reading = current_state
+            self._reading_since = now
+        
+        # The first reading is reported straight away; later ones once debounced
+        settled = self.last_state is None or now - self._reading_since >= self.DEBOUNCE_TIME
+        if current_state != self.last_state and settled:
             if self._callback:
                 self._callback(current_state)
+            if self._edge_callback:
+                self._edge_callback(self._reading_since, current_state)
             self.last_state = current_state
             
-        await asyncio.sleep(0.2)
+        return self.poll_interval
+    
+    async def monitor(self):
+        """Monitor handset position and trigger callback if state changes."""
+        await asyncio.sleep(self.poll())
     
     def cleanup(self):
         """Clean up GPIO resources."""
@@ -0,0 +1,162 @@
+import asyncio
+import concurrent.futures
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+logger = logging.getLogger('HardwareExecutor')
+
+# Number of recent scan timings kept per poller for jitter statistics
+JITTER_SAMPLES = 1000
+
+# Queued by add_poller() so a hardware thread blocked on an empty queue
+# picks up the new poller straight away
+_WAKE = object()
+
+
+class Poller:
+    def __init__(self, name: str, poll: Callable[[], float]):
+        """A periodic hardware poll; poll() returns the delay until its next run."""
+        self.name = name
+        self.poll = poll
+        self.next_due = time.monotonic()
+        self.runs = 0
+        self.lateness: deque = deque(maxlen=JITTER_SAMPLES)
+
+    def stats(self) -> dict:
+        """Return scan count and lateness percentiles in milliseconds."""
+        if not self.lateness:
+            return {"runs": self.runs}
+        samples = sorted(self.lateness)
+        return {
+            "runs": self.runs,
+            "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+            "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 3),
+            "max_ms": round(samples[-1] * 1000, 3)
+        }
+
+
+class HardwareExecutor:
+    def __init__(self, cpu: Optional[int] = None, priority: int = 50):
+        """Initialize the hardware executor.
+
+        All GPIO access goes through a single thread so that websocket
+        traffic can't delay scanning and slow hardware calls can't stall
+        the event loop.
+
+        Args:
+            cpu (int, optional): CPU to pin the hardware thread to. Defaults to the last CPU.
+            priority (int, optional): SCHED_FIFO priority for the thread. Defaults to 50.
+        """
+        self.cpu = cpu if cpu is not None else (os.cpu_count() or 1) - 1
+        self.priority = priority
+        self._pollers: list[Poller] = []
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self):
+        """Start the hardware thread. Must be called from the event loop thread."""
+        self._loop = asyncio.get_running_loop()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="hardware-io", daemon=True)
+        self._thread.start()
+
+    def stop(self, wait: bool = False):
+        """Ask the hardware thread to exit after its current operation.
+
+        Args:
+            wait (bool, optional): Block until the thread has exited, e.g. before
+                                   GPIO.cleanup(). Defaults to False.
+        """
+        self._running = False
+        self._queue.put(None)
+        if wait and self._thread:
+            self._thread.join()
+
+    def add_poller(self, name: str, poll: Callable[[], float]):
+        """Run poll() on the hardware thread, rescheduling it after the delay it returns.
+
+        May be called before or after start().
+        """
+        self._pollers.append(Poller(name, poll))
+        self._queue.put(_WAKE)
+
+    def submit(self, fn: Callable, *args) -> asyncio.Future:
+        """Queue a call for the hardware thread and return an awaitable for its result."""
+        future = concurrent.futures.Future()
+        self._queue.put((future, fn, args))
+        return asyncio.wrap_future(future, loop=self._loop)
+
+    def in_loop(self, callback: Callable) -> Callable:
+        """Wrap a callback so that calling it from the hardware thread runs it on the event loop."""
+        def post(*args):
+            self._loop.call_soon_threadsafe(callback, *args)
+        return post
+
+    def _configure_thread(self):
+        """Pin the current thread to a CPU and raise it to real-time priority."""
+        try:
+            os.sched_setaffinity(0, {self.cpu})
+        except (AttributeError, OSError) as e:
+            logger.warning(f"Could not pin hardware thread to CPU {self.cpu}: {e}")
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.priority))
+        except (AttributeError, OSError) as e:
+            logger.warning(f"Could not set real-time priority for hardware thread: {e}")
+
+    def _run(self):
+        """Hardware thread: run due pollers and queued commands until stopped."""
+        self._configure_thread()
+        logger.info(f"Hardware thread started on CPU {self.cpu}")
+
+        while self._running:
+            now = time.monotonic()
+            for poller in list(self._pollers):
+                if now < poller.next_due:
+                    continue
+                poller.lateness.append(now - poller.next_due)
+                poller.runs += 1
+                try:
+                    delay = poller.poll()
+                except Exception as e:
+                    logger.error(f"Error in {poller.name} poll: {e}")
+                    delay = 0.1
+                poller.next_due = now + delay
+
+            # Wait for a command until the next poll is due
+            if self._pollers:
+                timeout = max(0.0, min(p.next_due for p in self._pollers) - time.monotonic())
+            else:
+                timeout = None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                continue
+
+            while item is not None:
+                if item is not _WAKE:
+                    self._execute(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+
+    def _execute(self, item):
+        """Run one queued command and hand its result back to the waiting coroutine."""
+        future, fn, args = item
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+
+    def stats(self) -> dict:
+        """Return scan timing jitter for every poller."""
+        return {poller.name: poller.stats() for poller in self._pollers}
@@ -0,0 +1,99 @@
+import time
+from typing import Callable, Optional
+
+class HookGestureClassifier:
+    # Default timing windows, in seconds
+    PULSE_BREAK_MIN = 0.02   # Shorter on-hook blips are contact bounce
+    PULSE_BREAK_MAX = 0.2    # Longest on-hook break within a pulse-dialed digit
+    FLASH_MIN = 0.1          # Shortest single on-hook break counted as a hook-flash
+    FLASH_MAX = 0.6          # On-hook for longer than this is a hang-up
+    DIGIT_GAP = 0.4          # Off-hook this long after a break ends the gesture
+    POLL_INTERVAL = 0.01
+
+    def __init__(self,
+                 pulse_break_min: Optional[float] = None,
+                 pulse_break_max: Optional[float] = None,
+                 flash_min: Optional[float] = None,
+                 flash_max: Optional[float] = None,
+                 digit_gap: Optional[float] = None):
+        """Initialize the classifier with optional custom timing windows.
+
+        Classifies the handset's timestamped hook-switch edges into:
+            on_hook / off_hook: a real hang-up (on-hook longer than flash_max) or pickup
+            hook_flash: a single on-hook break between flash_min and flash_max
+            pulse_digit: a run of breaks between pulse_break_min and pulse_break_max,
+                         one break per count, with "0" for ten breaks
+
+        A single break that fits both windows counts as a hook-flash.
+        """
+        self.pulse_break_min = pulse_break_min or self.PULSE_BREAK_MIN
+        self.pulse_break_max = pulse_break_max or self.PULSE_BREAK_MAX
+        self.flash_min = flash_min or self.FLASH_MIN
+        self.flash_max = flash_max or self.FLASH_MAX
+        self.digit_gap = digit_gap or self.DIGIT_GAP
+        self.on_hook: Optional[bool] = None  # Confirmed state, None until the first edge
+        self._down: Optional[bool] = None    # Raw hook switch state
+        self._break_start = 0.0
+        self._last_make = 0.0
+        self._breaks: list[float] = []
+        self._callback: Optional[Callable[[str, Optional[str]], None]] = None
+
+    def set_callback(self, callback: Callable[[str, Optional[str]], None]):
+        """Set a callback function to be called with (event, value) for every classified event."""
+        self._callback = callback
+
+    def _emit(self, events: list, event: str, value: Optional[str] = None):
+        events.append((event, value))
+        if self._callback:
+            self._callback(event, value)
+
+    def feed(self, timestamp: float, down: bool) -> list:
+        """Process one hook switch edge (down = on-hook) and return the events it completed."""
+        events = self.flush(timestamp)
+        down = bool(down)
+        if down == self._down:
+            return events
+        self._down = down
+
+        if self.on_hook is None:
+            # First edge: report the starting position as it is
+            self.on_hook = down
+            self._emit(events, "on_hook" if down else "off_hook")
+        elif down:
+            self._break_start = timestamp
+        elif self.on_hook:
+            # Picked up after a confirmed hang-up
+            self.on_hook = False
+            self._emit(events, "off_hook")
+        else:
+            length = timestamp - self._break_start
+            if length >= self.pulse_break_min:
+                self._breaks.append(length)
+            self._last_make = timestamp
+        return events
+
+    def flush(self, now: float) -> list:
+        """Emit events whose timing window has closed by now."""
+        events = []
+        if self._down and not self.on_hook and now - self._break_start > self.flash_max:
+            self._classify(events)
+            self.on_hook = True
+            self._emit(events, "on_hook")
+        elif self._down is False and self._breaks and now - self._last_make >= self.digit_gap:
+            self._classify(events)
+        return events
+
+    def poll(self) -> float:
+        """Flush on the current time and return the delay before the next poll."""
+        self.flush(time.monotonic())
+        return self.POLL_INTERVAL
+
+    def _classify(self, events: list):
+        """Turn the breaks collected so far into a hook-flash or a digit."""
+        breaks, self._breaks = self._breaks, []
+        if not breaks:
+            return
+        if len(breaks) == 1 and self.flash_min <= breaks[0] <= self.flash_max:
+            self._emit(events, "hook_flash")
+        elif len(breaks) <= 10 and all(self.pulse_break_min <= b <= self.pulse_break_max for b in breaks):
+            self._emit(events, "pulse_digit", str(len(breaks) % 10))
@@ -2,16 +2,24 @@ import RPi.GPIO as GPIO
 import asyncio
 from typing import Callable, Optional
 
+# Default wiring of the keypad matrix
+ROW_PINS = [26, 19, 13, 6]
+COL_PINS = [21, 20, 16]
+KEYS = [
+    ['1', '2', '3'],
+    ['3', '6', '9'],
+    ['2', '5', '8'],
+    ['1', '4', '7']
+]
+
 class Keypad:
+    SCAN_INTERVAL = 0.05
+    DEBOUNCE_DELAY = 0.3
+    
     def __init__(self, 
-                 row_pins: list[int] = [26, 19, 13, 6],
-                 col_pins: list[int] = [21, 20, 16],
-                 keys: list[list[str]] = [
-                     ['1', '2', '3'],
-                     ['3', '6', '9'],
-                     ['2', '5', '8'],
-                     ['1', '4', '7']
-                 ]):
+                 row_pins: list[int] = ROW_PINS,
+                 col_pins: list[int] = COL_PINS,
+                 keys: list[list[str]] = KEYS):
         """Initialize the keypad with customizable pins and key layout."""
         self.row_pins = row_pins
         self.col_pins = col_pins
@@ -32,8 +40,8 @@ class Keypad:
         """Set a callback function to be called when a key is pressed."""
         self._callback = callback
     
-    async def scan(self):
-        """Scan the keypad and trigger callback if a key is pressed."""
+    def read_key(self) -> Optional[str]:
+        """Scan the key matrix once and return the pressed key, if any."""
         key = None
         for i, row_pin in enumerate(self.row_pins):
             GPIO.output(row_pin, GPIO.LOW)
@@ -44,16 +52,25 @@ class Keypad:
             GPIO.output(row_pin, GPIO.HIGH)
             if key:
                 break
+        return key
+    
+    def poll(self) -> float:
+        """Scan the keypad once, trigger callback on a new key, and return the delay before the next scan."""
+        key = self.read_key()
         
         if key and key != self.last_key:
             if self._callback:
                 self._callback(key)
             self.last_key = key
-            await asyncio.sleep(0.3)  # Debounce delay
+            return self.DEBOUNCE_DELAY + self.SCAN_INTERVAL
         elif not key:
             self.last_key = None
         
-        await asyncio.sleep(0.05)
+        return self.SCAN_INTERVAL
+    
+    async def scan(self):
+        """Scan the keypad and trigger callback if a key is pressed."""
+        await asyncio.sleep(self.poll())
     
     def cleanup(self):
         """Clean up GPIO resources."""
@@ -1,6 +1,7 @@
 import sys
 import time
 import subprocess
+import RPi.GPIO as GPIO
 
 class LED:
     def __init__(self, pin=4):
@@ -61,6 +62,33 @@ class LED:
             print(f"Error checking LED status: {e}")
             return False
 
+class GpioLED(LED):
+    """LED driven through RPi.GPIO instead of raspi-gpio.
+
+    Changing the level is a register write rather than a forked process,
+    so it is cheap enough for the server's real-time hardware thread. Unlike
+    with raspi-gpio, the pin is released again by GPIO.cleanup() on exit.
+    """
+
+    def setup(self):
+        """Configure GPIO pin as an output, keeping its current level."""
+        GPIO.setup(self.pin, GPIO.OUT)
+        return True
+
+    def on(self):
+        """Turn the LED on."""
+        GPIO.output(self.pin, GPIO.LOW)  # Set LOW to turn ON
+        return True
+
+    def off(self):
+        """Turn the LED off."""
+        GPIO.output(self.pin, GPIO.HIGH)  # Set HIGH to turn OFF
+        return True
+
+    def status(self):
+        """Return True if the LED is on (the pin is driven LOW)."""
+        return GPIO.input(self.pin) == GPIO.LOW
+
 # Command-line interface for testing
 if __name__ == "__main__":
     if len(sys.argv) < 2:
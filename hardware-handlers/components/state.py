@@ -0,0 +1,55 @@
+import json
+from typing import Optional
+
+
+class HardwareState:
+    # Fields included in the snapshot, in the order they are sent. Only
+    # hardware state belongs here: anything that changes on every connection
+    # (like the client count) would invalidate the cached frame each time.
+    FIELDS = ("handset", "led", "ringtone", "last_key")
+
+    def __init__(self):
+        """Initialize an empty state store.
+
+        Component callbacks keep this up to date so that clients can be
+        given the current state without touching the hardware.
+        """
+        self.handset: Optional[str] = None   # "up" or "down"
+        self.led: Optional[str] = None       # "on" or "off"
+        self.ringtone: Optional[str] = None  # Name of the ringtone playing, if any
+        self.last_key: Optional[str] = None
+        self._frame: Optional[str] = None
+
+    def update(self, **changes) -> bool:
+        """Update one or more fields and return True if anything changed."""
+        changed = False
+        for field, value in changes.items():
+            if field not in self.FIELDS:
+                raise AttributeError(f"Unknown state field: {field}")
+            if getattr(self, field) != value:
+                setattr(self, field, value)
+                changed = True
+
+        if changed:
+            # Rebuilt lazily by the next snapshot_frame() call
+            self._frame = None
+        return changed
+
+    def snapshot(self) -> dict:
+        """Return the current state as a state_snapshot event."""
+        return {
+            "event": "state_snapshot",
+            "handset": self.handset,
+            "led": self.led,
+            "ringtone": {
+                "playing": self.ringtone is not None,
+                "name": self.ringtone
+            },
+            "last_key": self.last_key
+        }
+
+    def snapshot_frame(self) -> str:
+        """Return the encoded state_snapshot message, re-encoding only after a change."""
+        if self._frame is None:
+            self._frame = json.dumps(self.snapshot())
+        return self._frame
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+logger = logging.getLogger('Profiler')
+
+# Longest window a single profile may run for, in seconds
+MAX_DURATION = 120.0
+
+
+class SamplingProfiler:
+    def __init__(self):
+        """Initialize an idle profiler."""
+        self.stacks: Counter = Counter()
+        self.tasks: Counter = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self.rate = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._started_at = 0.0
+        self._stopped_at = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the sampling thread is active."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float = 10.0, rate: int = 100):
+        """Start sampling every thread of this process. Must be called from the loop thread.
+
+        Args:
+            duration (float, optional): Seconds to sample for before stopping on its own.
+                                        Capped at MAX_DURATION. Defaults to 10.
+            rate (int, optional): Samples per second, at most 1000. Defaults to 100.
+
+        Raises:
+            ValueError: If duration or rate is not a positive, finite number.
+            OverflowError: If either is an integer too large to convert.
+        """
+        if self.running:
+            raise RuntimeError("Profiler is already running")
+
+        # Both usually come straight from a client message
+        if isinstance(duration, bool) or isinstance(rate, bool):
+            raise ValueError("duration and rate must be numbers")
+        duration = float(duration)
+        rate = float(rate)
+        # json.loads turns 1e999 into inf, which int() can't convert
+        if not (math.isfinite(duration) and math.isfinite(rate)):
+            raise ValueError("duration and rate must be finite")
+        rate = int(rate)
+        if not duration > 0 or rate < 1:
+            raise ValueError("duration and rate must be positive")
+
+        self.stacks.clear()
+        self.tasks.clear()
+        self.samples = 0
+        self.duration = min(max(duration, 0.1), MAX_DURATION)
+        self.rate = min(rate, 1000)
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._started_at = time.monotonic()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        logger.info(f"Profiler started for {self.duration:.1f}s at {self.rate} Hz")
+
+    async def stop(self) -> dict:
+        """Stop sampling (if still running) and return the collected profile.
+
+        The sampling thread can take up to one sample period to notice, so
+        the join runs in an executor to keep the event loop free.
+        """
+        self._stop_event.set()
+        if self._thread:
+            await asyncio.get_running_loop().run_in_executor(None, self._thread.join)
+        return self.result()
+
+    def _sample_loop(self):
+        """Sampling thread: walk every other thread's stack at a fixed rate."""
+        own_id = threading.get_ident()
+        period = 1.0 / self.rate
+        deadline = self._started_at + self.duration
+
+        while not self._stop_event.wait(period):
+            if time.monotonic() >= deadline:
+                break
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self._record(thread_id, names.get(thread_id, str(thread_id)), frame)
+            self.samples += 1
+
+        self._stopped_at = time.monotonic()
+        logger.info(f"Profiler stopped after {self.samples} samples")
+
+    def _record(self, thread_id: int, thread_name: str, frame):
+        """Add one stack to the collapsed-stack counts."""
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            labels.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        labels.append(thread_name)
+
+        if thread_id == self._loop_thread_id:
+            # Attribute loop samples to whichever asyncio task was running
+            task = asyncio.current_task(self._loop)
+            task_name = f"task:{task.get_name()}" if task else "task:<idle>"
+            self.tasks[task_name] += 1
+            labels.insert(-1, task_name)
+
+        self.stacks[";".join(reversed(labels))] += 1
+
+    def result(self) -> dict:
+        """Return the profile as collapsed stacks plus per-task sample counts."""
+        end = self._stopped_at if not self.running else time.monotonic()
+        return {
+            "samples": self.samples,
+            "rate": self.rate,
+            "elapsed": round(end - self._started_at, 3),
+            "collapsed": "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()),
+            "tasks": dict(self.tasks.most_common())
+        }
@@ -0,0 +1,151 @@
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Iterator, Optional
+
+logger = logging.getLogger('Recorder')
+
+# File layout: MAGIC, then a header holding the wall-clock start time in
+# nanoseconds, then one record per event: a RECORD header followed by
+# `length` payload bytes. Timestamps are monotonic nanoseconds since start.
+MAGIC = b"APHR\x01"
+HEADER = struct.Struct("<Q")
+RECORD = struct.Struct("<QBH")
+
+# Largest payload a record can hold
+MAX_PAYLOAD = 0xFFFF
+
+# Event kinds
+EVENT_HANDSET = 1   # payload: b"\x01" for down, b"\x00" for up
+EVENT_KEY = 2       # payload: the key, UTF-8
+EVENT_COMMAND = 3   # payload: the raw inbound message, UTF-8
+
+EVENT_NAMES = {
+    EVENT_HANDSET: "handset",
+    EVENT_KEY: "key",
+    EVENT_COMMAND: "command"
+}
+
+
+class EventRecorder:
+    def __init__(self):
+        """Initialize a recorder. Nothing is written until open() is called.
+
+        Records are encoded by the caller and written by a background
+        thread, so recording never puts file I/O on the event loop or the
+        hardware thread.
+        """
+        self.path: Optional[str] = None
+        self.count = 0
+        self.dropped = 0
+        self._start_ns = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether events are currently being written."""
+        return self._thread is not None
+
+    def open(self, path: str):
+        """Start recording events to a new file named after path and the start time.
+
+        Each run gets its own file, e.g. events-20240501-142530.bin for
+        events.bin, so restarting after a crash never overwrites the
+        recording of the crash. The actual file name is kept in self.path.
+        """
+        root, ext = os.path.splitext(path)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        suffix = 0
+        while True:
+            self.path = f"{root}-{stamp}{f'-{suffix}' if suffix else ''}{ext}"
+            try:
+                file = open(self.path, "xb")
+                break
+            except FileExistsError:
+                suffix += 1
+        self._start_ns = time.monotonic_ns()
+        file.write(MAGIC + HEADER.pack(time.time_ns()))
+        file.flush()
+        self._thread = threading.Thread(target=self._write_loop, args=(file,), name="event-recorder", daemon=True)
+        self._thread.start()
+        logger.info(f"Recording hardware events to {self.path}")
+
+    def close(self):
+        """Stop recording, write out any queued events and close the file."""
+        thread, self._thread = self._thread, None
+        if thread:
+            self._queue.put(None)
+            thread.join()
+
+    def record(self, kind: int, payload: bytes, timestamp: Optional[float] = None):
+        """Queue one event for writing. Safe to call from any thread; a no-op when not recording.
+
+        Args:
+            kind (int): One of the EVENT_* kinds.
+            payload (bytes): Event payload of at most MAX_PAYLOAD bytes. Larger
+                             payloads are dropped rather than cut, since a cut
+                             could split a UTF-8 sequence.
+            timestamp (float, optional): time.monotonic() at which the event happened.
+                                         Defaults to now.
+        """
+        if self._thread is None:
+            return
+        if len(payload) > MAX_PAYLOAD:
+            self.dropped += 1
+            logger.warning(f"Not recording {EVENT_NAMES.get(kind, kind)} event of {len(payload)} bytes "
+                           f"(limit {MAX_PAYLOAD})")
+            return
+        now_ns = int(timestamp * 1e9) if timestamp is not None else time.monotonic_ns()
+        timestamp = max(0, now_ns - self._start_ns)
+        self._queue.put(RECORD.pack(timestamp, kind, len(payload)) + payload)
+
+    def _write_loop(self, file):
+        """Writer thread: append queued records, flushing whenever the queue runs dry."""
+        with file:
+            while True:
+                record = self._queue.get()
+                while record is not None:
+                    file.write(record)
+                    self.count += 1
+                    try:
+                        record = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                file.flush()
+                if record is None:
+                    return
+
+    def record_handset(self, state: bool, timestamp: Optional[float] = None):
+        """Record a handset edge (True = down, False = up)."""
+        self.record(EVENT_HANDSET, b"\x01" if state else b"\x00", timestamp)
+
+    def record_key(self, key: str):
+        """Record a key press."""
+        self.record(EVENT_KEY, key.encode())
+
+    def record_command(self, message: str):
+        """Record an inbound websocket message."""
+        self.record(EVENT_COMMAND, message.encode() if isinstance(message, str) else message)
+
+
+def read_events(path: str) -> Iterator[tuple[int, int, bytes]]:
+    """Yield (timestamp_ns, kind, payload) for every event in a recording."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a hardware event recording")
+        f.read(HEADER.size)
+
+        while True:
+            header = f.read(RECORD.size)
+            if len(header) < RECORD.size:
+                # A truncated trailing record means the server stopped mid-write
+                return
+            timestamp, kind, length = RECORD.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield timestamp, kind, payload
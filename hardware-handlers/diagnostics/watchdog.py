@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+logger = logging.getLogger('Watchdog')
+
+# Frames from files under this directory are treated as "our" code when
+# deciding which call site is responsible for a stall
+HANDLERS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Upper bounds (in milliseconds) of the stall duration histogram buckets
+STALL_BUCKETS_MS = [100, 250, 500, 1000, 2500, 5000]
+
+
+def frame_label(frame: traceback.FrameSummary) -> str:
+    """Return a short "file:line function" label for a stack frame."""
+    return f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}"
+
+
+def find_call_site(stack: traceback.StackSummary) -> str:
+    """Pick the innermost frame in our own code from a captured stack.
+
+    Blocking calls usually stall inside the standard library (subprocess,
+    time.sleep, selectors), so the innermost frame alone is not useful.
+    The innermost frame under the hardware-handlers directory is the call
+    that made the blocking request.
+    """
+    for frame in reversed(stack):
+        if frame.filename.startswith(HANDLERS_DIR):
+            return frame_label(frame)
+    return frame_label(stack[-1]) if stack else "unknown"
+
+
+class LoopWatchdog:
+    def __init__(self, threshold: float = 0.1, interval: float = 0.05):
+        """Initialize the watchdog.
+
+        Args:
+            threshold (float, optional): Loop lag in seconds that counts as a stall.
+                                         Defaults to 0.1.
+            interval (float, optional): Heartbeat interval in seconds. Defaults to 0.05.
+        """
+        self.threshold = threshold
+        self.interval = interval
+        self.max_lag = 0.0
+        self.stalls: dict[str, dict] = {}
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._stall_site: Optional[str] = None
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start watching the running event loop. Must be called from the loop thread."""
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._running = True
+        self._task = asyncio.create_task(self._heartbeat(), name="loop_watchdog")
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"Loop watchdog started (threshold {self.threshold * 1000:.0f} ms)")
+
+    def stop(self):
+        """Stop the heartbeat task and the helper thread."""
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self):
+        """Sleep for one interval at a time and measure how late each wakeup is."""
+        while self._running:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_beat = now
+            lag = now - expected
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= self.threshold:
+                self._record_stall(lag)
+
+    def _watch(self):
+        """Helper thread: capture the loop thread's stack while it is stalled."""
+        while self._running:
+            time.sleep(self.interval / 4)
+            if self._stall_site is not None:
+                continue
+            if time.monotonic() - self._last_beat < self.threshold + self.interval:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            self._stall_site = find_call_site(stack)
+            logger.warning(f"Event loop stalled in {self._stall_site}\n"
+                           + "".join(stack.format()))
+
+    def _record_stall(self, lag: float):
+        """Add a finished stall to the per-call-site histogram."""
+        site = self._stall_site or "unknown"
+        self._stall_site = None
+        lag_ms = lag * 1000
+
+        entry = self.stalls.setdefault(site, {
+            "count": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "buckets": [0] * (len(STALL_BUCKETS_MS) + 1)
+        })
+        entry["count"] += 1
+        entry["total_ms"] += lag_ms
+        entry["max_ms"] = max(entry["max_ms"], lag_ms)
+        for i, bound in enumerate(STALL_BUCKETS_MS):
+            if lag_ms <= bound:
+                entry["buckets"][i] += 1
+                break
+        else:
+            entry["buckets"][-1] += 1
+
+        logger.warning(f"Event loop stalled for {lag_ms:.0f} ms in {site}")
+
+    def stats(self) -> dict:
+        """Return lag and stall histogram metrics as a JSON-serialisable dict."""
+        return {
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "bucket_bounds_ms": STALL_BUCKETS_MS,
+            "stalls": {
+                site: {
+                    "count": entry["count"],
+                    "total_ms": round(entry["total_ms"], 1),
+                    "max_ms": round(entry["max_ms"], 1),
+                    "buckets": list(entry["buckets"])
+                }
+                for site, entry in self.stalls.items()
+            }
+        }
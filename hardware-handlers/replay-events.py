@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Replay a hardware event recording against the server on simulated GPIO.
+
+Record on the phone with AI_PHONE_RECORD=/path/to/events.bin, which writes
+one timestamped file per server run, then e.g.:
+
+    python3 replay-events.py events-20240501-142530.bin --speed 50
+
+Handset edges and key presses are fed through the simulated GPIO pins and
+inbound commands are sent over a websocket, so every event travels the same
+path through the server as it did in production. The tool reports how long
+each event took to come back out as a broadcast and whether any came back
+out of order. Hook switch edges are run through the same gesture classifier
+as the server to work out which broadcasts they should produce.
+
+The classifier tells pulses, flashes and hang-ups apart by how long the
+hook switch is held, so --speed never shortens the gap between two handset
+edges below HOOK_SETTLE. Shorter gaps are replayed at their recorded length
+and everything after them is pushed back to match.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import socket
+import sys
+import time
+
+import websockets
+
+from diagnostics.recorder import read_events, EVENT_HANDSET, EVENT_KEY, EVENT_COMMAND, EVENT_NAMES
+from simulation import gpio
+from simulation.server import load_server
+from components.hook_gestures import HookGestureClassifier
+
+# How long to wait after the last event for its response to arrive
+SETTLE_TIME = 1.0
+
+# Gaps between handset edges are never compressed below this. Any gap at
+# least this long already closes every gesture window, so shortening it
+# further doesn't change the classification.
+HOOK_SETTLE = max(HookGestureClassifier.FLASH_MAX, HookGestureClassifier.DIGIT_GAP) + 0.1
+
+
+# Broadcast produced by each hook gesture classifier event
+GESTURE_RESPONSES = {
+    "on_hook": lambda value: ("handset_state", "down"),
+    "off_hook": lambda value: ("handset_state", "up"),
+    "hook_flash": lambda value: ("hook_flash", None),
+    "pulse_digit": lambda value: ("pulse_digit", value)
+}
+
+
+def handset_responses(events: list, classifier) -> dict:
+    """Map each handset event's index to the broadcasts its edge completes."""
+    responses = {}
+    last = None
+    for i, (timestamp, kind, payload) in enumerate(events):
+        if kind != EVENT_HANDSET:
+            continue
+        t = timestamp / 1e9
+        # Windows that closed before this edge belong to the previous one
+        for event, value in classifier.flush(t):
+            responses.setdefault(last, []).append(GESTURE_RESPONSES[event](value))
+        for event, value in classifier.feed(t, payload == b"\x01"):
+            responses.setdefault(i, []).append(GESTURE_RESPONSES[event](value))
+        last = i
+    for event, value in classifier.flush(float("inf")):
+        responses.setdefault(last, []).append(GESTURE_RESPONSES[event](value))
+    return responses
+
+
+def expected_response(kind: int, payload: bytes):
+    """Return the (event, value) broadcast a key press or command should produce, or None."""
+    if kind == EVENT_KEY:
+        return ("keypad_press", payload.decode())
+    if kind == EVENT_COMMAND:
+        try:
+            event_type = json.loads(payload).get("event")
+        except (ValueError, AttributeError):
+            return None
+        if event_type == "led_on":
+            return ("led_state", "on")
+        if event_type == "led_off":
+            return ("led_state", "off")
+    return None
+
+
+def summarize(latencies: list[float]) -> dict:
+    """Return count and p50/p99/max in milliseconds."""
+    if not latencies:
+        return {"count": 0}
+    samples = sorted(latencies)
+    return {
+        "count": len(samples),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3)
+    }
+
+
+def free_port() -> int:
+    """Return a free TCP port on localhost."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def connect(url: str, timeout: float = 10.0):
+    """Connect to the server, retrying while it starts up."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return await websockets.connect(url)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+async def replay(path: str, speed: float) -> dict:
+    """Replay a recording and return ordering and latency statistics."""
+    events = list(read_events(path))
+    server = load_server(speed)
+    logging.getLogger().setLevel(logging.WARNING)
+    # Only importable once load_server() has installed the simulated GPIO
+    from components.handset import HANDSET_PIN
+
+    # Judge the recording with the classifier's windows at real-time speed
+    expected_handset = handset_responses(events, HookGestureClassifier())
+
+    # Start with the hook switch where the recording found it
+    handset_level = next((p == b"\x01" for _, k, p in events if k == EVENT_HANDSET), True)
+    gpio.set_input(HANDSET_PIN, handset_level)
+
+    port = free_port()
+    server_task = asyncio.create_task(server.main(host="127.0.0.1", port=port))
+    client = await connect(f"ws://127.0.0.1:{port}")
+    await client.recv()  # Initial state_snapshot
+
+    pending = []  # (expected, kind, injected_at) in injection order
+    latencies = {name: [] for name in EVENT_NAMES.values()}
+    out_of_order = 0
+
+    async def receive():
+        nonlocal out_of_order
+        async for message in client:
+            data = json.loads(message)
+            response = (data.get("event"), data.get("state", data.get("key", data.get("digit"))))
+            for i, (expected, kind, injected_at) in enumerate(pending):
+                if expected == response:
+                    latencies[EVENT_NAMES[kind]].append(time.monotonic() - injected_at)
+                    # Hang-ups are held back by the classifier, so only order within a kind
+                    if any(k == kind for _, k, _ in pending[:i]):
+                        out_of_order += 1
+                    del pending[i]
+                    break
+
+    receiver = asyncio.create_task(receive())
+    hold = server.Keypad.SCAN_INTERVAL * 2
+    unobserved = 0
+    start = time.monotonic()
+    first_ts = events[0][0] if events else 0
+    target = start
+    previous_ts = first_ts
+    last_edge = None  # (timestamp, target) of the previous handset event
+
+    for index, (timestamp, kind, payload) in enumerate(events):
+        target += (timestamp - previous_ts) / 1e9 / speed
+        previous_ts = timestamp
+        if kind == EVENT_HANDSET:
+            if last_edge:
+                gap = (timestamp - last_edge[0]) / 1e9
+                target = max(target, last_edge[1] + min(gap, HOOK_SETTLE))
+            last_edge = (timestamp, target)
+        await asyncio.sleep(max(0.0, target - time.monotonic()))
+
+        expected = [expected_response(kind, payload)]
+        if kind == EVENT_HANDSET:
+            expected = expected_handset.get(index, [])
+            level = payload == b"\x01"
+            if level == handset_level:
+                # Already in this state, e.g. the edge reported at server start
+                continue
+            handset_level = level
+            gpio.set_input(HANDSET_PIN, level)
+        elif kind == EVENT_KEY:
+            gpio.press_key(payload.decode())
+            asyncio.get_running_loop().call_later(hold, gpio.release_keys)
+        elif kind == EVENT_COMMAND:
+            await client.send(payload.decode(errors="replace"))
+
+        injected_at = time.monotonic()
+        pending.extend((response, kind, injected_at) for response in expected if response)
+        if not any(expected):
+            unobserved += 1
+
+    await asyncio.sleep(SETTLE_TIME)
+    elapsed = time.monotonic() - start
+
+    receiver.cancel()
+    await client.close()
+    server_task.cancel()
+    server.hardware.stop()
+    server.watchdog.stop()
+    if server.current_ringtone_process:
+        server.current_ringtone_process.kill()
+
+    return {
+        "events": len(events),
+        "speed": speed,
+        "recorded_seconds": round((events[-1][0] - first_ts) / 1e9, 3) if events else 0,
+        "replay_seconds": round(elapsed, 3),
+        "latency": {name: summarize(values) for name, values in latencies.items()},
+        "missing": len(pending),
+        "out_of_order": out_of_order,
+        "unobserved": unobserved,
+        "scan_jitter": server.hardware.stats()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a hardware event recording on simulated GPIO.")
+    parser.add_argument("recording", help="Recording written with AI_PHONE_RECORD")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed factor (default: real time)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(replay(args.recording, args.speed))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"Replayed {results['events']} events ({results['recorded_seconds']}s recorded) "
+              f"in {results['replay_seconds']}s at {results['speed']}x")
+        for name, stats in results["latency"].items():
+            if stats["count"]:
+                print(f"  {name:8s} n={stats['count']:<5d} p50={stats['p50_ms']}ms "
+                      f"p99={stats['p99_ms']}ms max={stats['max_ms']}ms")
+        print(f"  missing responses: {results['missing']}, out of order: {results['out_of_order']}, "
+              f"no observable response: {results['unobserved']}")
+    sys.exit(1 if results["missing"] or results["out_of_order"] else 0)
+
+
+if __name__ == "__main__":
+    main()
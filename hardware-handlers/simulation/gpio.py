@@ -0,0 +1,103 @@
+"""Simulated stand-in for RPi.GPIO.
+
+Implements the subset of the RPi.GPIO API used by the components, plus a
+few controls for driving inputs from a test harness. Call install() before
+importing any component so that `import RPi.GPIO as GPIO` resolves here.
+"""
+import sys
+import types
+
+BCM = 11
+BOARD = 10
+OUT = 0
+IN = 1
+LOW = 0
+HIGH = 1
+PUD_OFF = 20
+PUD_DOWN = 21
+PUD_UP = 22
+
+_mode = None
+_directions: dict[int, int] = {}
+_pulls: dict[int, int] = {}
+_outputs: dict[int, int] = {}
+_driven: dict[int, int] = {}
+_links: dict[int, int] = {}
+
+
+def setmode(mode):
+    global _mode
+    _mode = mode
+
+
+def getmode():
+    return _mode
+
+
+def setwarnings(flag):
+    pass
+
+
+def setup(pin, direction, pull_up_down=PUD_OFF, initial=None):
+    _directions[pin] = direction
+    _pulls[pin] = pull_up_down
+    if direction == OUT:
+        _outputs[pin] = HIGH if initial is None else initial
+
+
+def output(pin, value):
+    _outputs[pin] = HIGH if value else LOW
+
+
+def input(pin):
+    if pin in _driven:
+        return _driven[pin]
+    if pin in _links:
+        return _outputs.get(_links[pin], HIGH)
+    if pin in _outputs:
+        return _outputs[pin]
+    return HIGH if _pulls.get(pin) == PUD_UP else LOW
+
+
+def cleanup(pin=None):
+    pins = list(_directions) if pin is None else [pin]
+    for p in pins:
+        _directions.pop(p, None)
+        _pulls.pop(p, None)
+        _outputs.pop(p, None)
+
+
+# Simulation controls
+
+def set_input(pin: int, level: int):
+    """Drive an input pin from outside, as a switch or sensor would."""
+    _driven[pin] = HIGH if level else LOW
+
+
+def release_input(pin: int):
+    """Stop driving an input pin so it falls back to its pull resistor."""
+    _driven.pop(pin, None)
+
+
+def press_key(key: str):
+    """Close the keypad matrix switch for key, using the default wiring."""
+    # Imported here because components.keypad imports RPi.GPIO itself
+    from components.keypad import ROW_PINS, COL_PINS, KEYS
+    for i, row in enumerate(KEYS):
+        if key in row:
+            _links[COL_PINS[row.index(key)]] = ROW_PINS[i]
+            return
+    raise ValueError(f"Key {key!r} is not on the keypad")
+
+
+def release_keys():
+    """Open every keypad matrix switch."""
+    _links.clear()
+
+
+def install():
+    """Register this module as RPi.GPIO."""
+    package = types.ModuleType("RPi")
+    package.GPIO = sys.modules[__name__]
+    sys.modules["RPi"] = package
+    sys.modules["RPi.GPIO"] = sys.modules[__name__]
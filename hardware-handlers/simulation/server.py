@@ -0,0 +1,47 @@
+"""Load socket-server.py against simulated hardware."""
+import importlib.util
+import os
+import sys
+
+from simulation import gpio
+
+HANDLERS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Silent stand-in for aplay; the ringtone path is appended as an ignored argument
+STAND_IN_PLAYER = [sys.executable, "-c", "import time; time.sleep(20)"]
+
+
+def load_server(speed: float = 1.0):
+    """Import socket-server.py with simulated GPIO and a stand-in ringtone player.
+
+    Args:
+        speed (float, optional): Factor to shorten the keypad scan interval
+                                 and debounce delay by. Handset sampling and
+                                 hook gesture windows always run in real time,
+                                 since scaling them makes the classification
+                                 depend on scheduling jitter. Defaults to 1.0.
+
+    Returns:
+        module: The loaded server module, ready for main() to be run.
+    """
+    gpio.install()
+
+    spec = importlib.util.spec_from_file_location(
+        "socket_server", os.path.join(HANDLERS_DIR, "socket-server.py"))
+    server = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(server)
+
+    server.RINGTONE_PLAYER = STAND_IN_PLAYER
+    # Never touch real aplay processes, the real server's socket or its
+    # recordings from a simulation, whatever the environment says
+    server.kill_aplay = lambda: None
+    server.UNIX_SOCKET_PATH = ""
+    server.RECORD_PATH = None
+    server.AUDIO_PROCESS = False
+
+    # Subclass rather than modify so repeated loads don't compound the speedup
+    server.Keypad = type("Keypad", (server.Keypad,), {
+        "SCAN_INTERVAL": server.Keypad.SCAN_INTERVAL / speed,
+        "DEBOUNCE_DELAY": server.Keypad.DEBOUNCE_DELAY / speed
+    })
+    return server
@@ -1,4 +1,9 @@
 import asyncio
+import base64
+import binascii
+import contextlib
+import shutil
+import stat
 import websockets
 import RPi.GPIO as GPIO
 import json
@@ -11,8 +16,15 @@ import sys
 import signal
 from components.keypad import Keypad
 from components.handset import Handset
-from components.led import LED
+from components.led import GpioLED
 from components.speaker import Speaker
+from components.state import HardwareState
+from components.hardware_executor import HardwareExecutor
+from components.audio_output import AudioOutput
+from components.hook_gestures import HookGestureClassifier
+from diagnostics.watchdog import LoopWatchdog
+from diagnostics.profiler import SamplingProfiler
+from diagnostics.recorder import EventRecorder
 
 # Add the parent directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -30,12 +42,48 @@ logging.getLogger('asyncio').setLevel(logging.INFO)
 GPIO.setmode(GPIO.BCM)
 GPIO.setwarnings(False)
 
+# Set AI_PHONE_RECORD to a file path to record hardware edges and inbound
+# commands; each run writes its own file with the start time appended
+RECORD_PATH = os.environ.get("AI_PHONE_RECORD")
+
+# Set AI_PHONE_AUDIO_PROCESS=1 to accept audio_chunk PCM and play it from a separate process
+AUDIO_PROCESS = os.environ.get("AI_PHONE_AUDIO_PROCESS") == "1"
+
+# Set AI_PHONE_UNIX_SOCKET to also serve co-located clients on a Unix domain
+# socket, e.g. /run/ai-phone/hardware.sock. Access is controlled by the
+# socket file's mode and group. Keep it in a directory other users can't
+# write to, so nobody else can create the file first.
+UNIX_SOCKET_PATH = os.environ.get("AI_PHONE_UNIX_SOCKET", "")
+UNIX_SOCKET_MODE = int(os.environ.get("AI_PHONE_UNIX_SOCKET_MODE", "660"), 8)
+UNIX_SOCKET_GROUP = os.environ.get("AI_PHONE_UNIX_SOCKET_GROUP")
+
+# Command used to play ringtones; the ringtone path is appended
+RINGTONE_PLAYER = ['aplay', '-D', 'plughw:2,0', '--max-file-time=20']
+
 # Store connected clients
 connected_clients: Set[websockets.WebSocketServerProtocol] = set()
 
 # Store current ringtone process
 current_ringtone_process = None
 
+# Cached hardware state, kept current by the component callbacks
+hardware_state = HardwareState()
+
+# Single thread that owns every GPIO operation, started in main()
+hardware = HardwareExecutor()
+
+# Event loop stall watchdog, started in main()
+watchdog = LoopWatchdog()
+
+# On-demand sampling profiler, driven by profile_start/profile_stop
+profiler = SamplingProfiler()
+
+# Hardware event recorder, opened in main() when RECORD_PATH is set
+recorder = EventRecorder()
+
+# Speaker output worker process, started in main() when AUDIO_PROCESS is set
+audio_output = None
+
 def get_local_ip():
     """Get the local IP address of the machine."""
     try:
@@ -59,16 +107,6 @@ async def broadcast_event(event_type: str, data: dict):
             *[client.send(message) for client in connected_clients]
         )
 
-async def monitor_keypad(keypad: Keypad):
-    """Monitor keypad and broadcast key presses."""
-    while True:
-        await keypad.scan()
-
-async def monitor_handset(handset: Handset):
-    """Monitor handset position and broadcast changes."""
-    while True:
-        await handset.monitor()
-
 def kill_aplay():
     """Kill all aplay processes using direct system commands."""
     try:
@@ -119,19 +157,19 @@ async def play_ringtone(speaker: Speaker, ringtone_name: str):
     # Start new ringtone
     logger.info(f"EVENT: Playing ringtone {ringtone_name}")
     current_ringtone_process = await asyncio.create_subprocess_exec(
-        'aplay',
-        '-D', f'plughw:2,0',
-        '--max-file-time=20',
+        *RINGTONE_PLAYER,
         os.path.join(speaker.ringtones_dir, ringtone_name),
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE
     )
+    hardware_state.update(ringtone=ringtone_name)
+    process = current_ringtone_process
     
     # Create a background task to monitor the process
     async def monitor_process():
         global current_ringtone_process
         try:
-            await current_ringtone_process.wait()
+            await process.wait()
             logger.info(f"EVENT: Ringtone finished playing {ringtone_name}")
         except asyncio.CancelledError:
             if current_ringtone_process:
@@ -141,7 +179,10 @@ async def play_ringtone(speaker: Speaker, ringtone_name: str):
                     current_ringtone_process.kill()
             raise
         finally:
-            current_ringtone_process = None
+            # A newer ringtone may have replaced this one in the meantime
+            if current_ringtone_process is process:
+                current_ringtone_process = None
+                hardware_state.update(ringtone=None)
     
     # Start the monitoring task in the background
     asyncio.create_task(monitor_process())
@@ -160,6 +201,7 @@ async def stop_ringtone(reason="manual"):
             current_ringtone_process = None
         except:
             pass
+        hardware_state.update(ringtone=None)
         
         # Emit a special event for ringtone stopped
         await broadcast_event("ringtone_stopped", {"reason": reason})
@@ -168,6 +210,8 @@ async def stop_ringtone(reason="manual"):
 
 async def handle_handset_state(state):
     """Handle handset state changes and stop ringtone when picked up."""
+    hardware_state.update(handset="down" if state else "up")
+    
     # Broadcast the handset state change
     await broadcast_event("handset_state", {"state": "down" if state else "up"})
     
@@ -177,49 +221,72 @@ async def handle_handset_state(state):
         if current_ringtone_process:
             await stop_ringtone(reason="handset_pickup")
 
-async def handle_client(websocket: websockets.WebSocketServerProtocol, handset: Handset, keypad: Keypad, led: LED, speaker: Speaker):
+async def handle_key_press(key):
+    """Record the key press and broadcast it."""
+    hardware_state.update(last_key=key)
+    await broadcast_event("keypad_press", {"key": key})
+
+async def handle_hook_gesture(event, value):
+    """Handle classified hook switch events."""
+    if event == "on_hook":
+        await handle_handset_state(True)
+    elif event == "off_hook":
+        await handle_handset_state(False)
+    elif event == "hook_flash":
+        await broadcast_event("hook_flash", {})
+    elif event == "pulse_digit":
+        await broadcast_event("pulse_digit", {"digit": value})
+
+async def handle_client(websocket: websockets.WebSocketServerProtocol, handset: Handset, keypad: Keypad, led: GpioLED, speaker: Speaker):
     """Handle individual client connections."""
-    client_info = f"{websocket.remote_address[0]}:{websocket.remote_address[1]}"
+    # Unix socket peers have no address
+    address = websocket.remote_address
+    client_info = f"{address[0]}:{address[1]}" if address else "unix socket"
     
     try:
         connected_clients.add(websocket)
         
-        # Send initial states silently
-        handset_state = handset.get_state()
-        await websocket.send(json.dumps({
-            "event": "handset_state",
-            "state": "down" if handset_state else "up"
-        }))
-        
-        # Send initial LED state silently
-        led_state = led.status()
-        await websocket.send(json.dumps({
-            "event": "led_state",
-            "state": "on" if led_state else "off"
-        }))
+        # Send the cached initial state silently, without touching the hardware
+        await websocket.send(hardware_state.snapshot_frame())
         
         # Handle incoming messages
         async for message in websocket:
             try:
                 data = json.loads(message)
+                # Audio chunks carry base64 PCM many times a second; keep
+                # them out of the recording and the log
+                is_audio = isinstance(data, dict) and data.get("event") == "audio_chunk"
+                if not is_audio:
+                    recorder.record_command(message)
                 
                 if "event" in data:
                     event_type = data["event"]
-                    logger.info(f"EVENT IN: {event_type} {json.dumps({k:v for k,v in data.items() if k != 'event'})}")
+                    if not is_audio:
+                        logger.info(f"EVENT IN: {event_type} {json.dumps({k:v for k,v in data.items() if k != 'event'})}")
                     
                     if event_type == "led_on":
-                        led.on()
+                        # Sent for every audio delta while the AI speaks, so
+                        # only go to the hardware thread when the level changes
+                        if hardware_state.led != "on":
+                            await hardware.submit(led.on)
+                            hardware_state.update(led="on")
                         await broadcast_event("led_state", {"state": "on"})
                     elif event_type == "led_off":
-                        led.off()
+                        if hardware_state.led != "off":
+                            await hardware.submit(led.off)
+                            hardware_state.update(led="off")
                         await broadcast_event("led_state", {"state": "off"})
                     elif event_type == "led_status":
                         # Respond only to the requesting client
-                        led_state = led.status()
+                        led_state = "on" if await hardware.submit(led.status) else "off"
+                        hardware_state.update(led=led_state)
                         await websocket.send(json.dumps({
                             "event": "led_state",
-                            "state": "on" if led_state else "off"
+                            "state": led_state
                         }))
+                    elif event_type == "get_state":
+                        # Served from the cache; respond only to the requesting client
+                        await websocket.send(hardware_state.snapshot_frame())
                     elif event_type == "ring":
                         # Handle ring event
                         ringtone_name = data.get("ringtone", "telephone-ring-02.wav")
@@ -236,7 +303,62 @@ async def handle_client(websocket: websockets.WebSocketServerProtocol, handset:
                         }
                         await broadcast_event("ai_realtime_client_message", message_data)
                         
+                    elif event_type == "get_metrics":
+                        # Respond only to the requesting client
+                        await websocket.send(json.dumps({
+                            "event": "metrics",
+                            "clients": len(connected_clients),
+                            "watchdog": watchdog.stats(),
+                            "hardware": hardware.stats(),
+                            "audio": audio_output.stats() if audio_output else None
+                        }))
+                        
+                    elif event_type == "audio_chunk" and audio_output:
+                        # Base64 PCM16 mono 24 kHz, as in the realtime API audio deltas
+                        try:
+                            audio_output.write(base64.b64decode(data.get("audio", ""), validate=True))
+                        except (binascii.Error, TypeError) as e:
+                            logger.error(f"Invalid audio_chunk payload: {e}")
+                        
+                    elif event_type == "audio_end" and audio_output:
+                        audio_output.end()
+                        
+                    elif event_type == "audio_stop" and audio_output:
+                        audio_output.stop()
+                        
+                    elif event_type == "profile_start":
+                        # Sample the live process for a bounded window
+                        if profiler.running:
+                            await websocket.send(json.dumps({
+                                "event": "profile_state",
+                                "state": "already_running"
+                            }))
+                        else:
+                            try:
+                                profiler.start(duration=data.get("duration", 10), rate=data.get("rate", 100))
+                            except (TypeError, ValueError, OverflowError) as e:
+                                await websocket.send(json.dumps({
+                                    "event": "profile_state",
+                                    "state": "error",
+                                    "error": str(e)
+                                }))
+                                continue
+                            await websocket.send(json.dumps({
+                                "event": "profile_state",
+                                "state": "started",
+                                "duration": profiler.duration,
+                                "rate": profiler.rate
+                            }))
+                        
+                    elif event_type == "profile_stop":
+                        # Return collapsed stacks to the requesting client
+                        await websocket.send(json.dumps({
+                            "event": "profile_result",
+                            **await profiler.stop()
+                        }))
+                        
             except json.JSONDecodeError as e:
+                recorder.record_command(message)
                 logger.error(f"Invalid JSON received: {message}")
         
         await websocket.wait_closed()
@@ -246,37 +368,114 @@ async def handle_client(websocket: websockets.WebSocketServerProtocol, handset:
     finally:
         connected_clients.remove(websocket)
 
-async def main():
+@contextlib.asynccontextmanager
+async def serve_unix_socket(handler, path: str):
+    """Serve the websocket protocol on a Unix domain socket with restricted permissions.
+
+    The socket file is removed again when the context exits.
+    """
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory, mode=0o750)
+        if UNIX_SOCKET_GROUP:
+            shutil.chown(directory, group=UNIX_SOCKET_GROUP)
+    
+    try:
+        if not stat.S_ISSOCK(os.lstat(path).st_mode):
+            raise RuntimeError(f"Refusing to replace {path}: it exists and is not a socket")
+        os.unlink(path)  # Left over from a previous run
+    except FileNotFoundError:
+        pass
+    
+    # Set permissions on the file itself rather than through the umask, which
+    # is process-wide and would also affect files created by other threads
+    try:
+        async with websockets.unix_serve(handler, path) as server:
+            os.chmod(path, UNIX_SOCKET_MODE)
+            if UNIX_SOCKET_GROUP:
+                shutil.chown(path, group=UNIX_SOCKET_GROUP)
+            yield server
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+
+async def main(host: str = "0.0.0.0", port: int = 8765):
     """Main function to start the WebSocket server."""
+    global audio_output
     local_ip = get_local_ip()
     
+    # Fork the audio worker before any threads are started
+    if AUDIO_PROCESS:
+        audio_output = AudioOutput()
+        audio_output.start()
+    
+    # Start the hardware thread; GPIO components are set up on it
+    hardware.start()
+    
     # Initialize components
-    keypad = Keypad()
-    handset = Handset()
-    led = LED()
+    keypad = await hardware.submit(Keypad)
+    handset = await hardware.submit(Handset)
+    led = await hardware.submit(GpioLED)
     speaker = Speaker()
     
-    # Set up callbacks
-    keypad.set_callback(lambda key: asyncio.create_task(
-        broadcast_event("keypad_press", {"key": key})
-    ))
+    # Seed the state cache; callbacks keep it current from here on
+    hardware_state.update(
+        handset="down" if await hardware.submit(handset.get_state) else "up",
+        led="on" if await hardware.submit(led.status) else "off"
+    )
     
-    handset.set_callback(lambda state: asyncio.create_task(
-        handle_handset_state(state)
+    if RECORD_PATH:
+        recorder.open(RECORD_PATH)
+    
+    # Set up callbacks; they fire on the hardware thread and are posted to the loop
+    post_key = hardware.in_loop(lambda key: asyncio.create_task(
+        handle_key_press(key)
+    ))
+    post_gesture = hardware.in_loop(lambda event, value: asyncio.create_task(
+        handle_hook_gesture(event, value)
     ))
     
-    # Start monitoring tasks
-    handset_task = asyncio.create_task(monitor_handset(handset))
-    keypad_task = asyncio.create_task(monitor_keypad(keypad))
+    def on_key(key):
+        recorder.record_key(key)
+        post_key(key)
+    
+    # Hook switch edges go through the gesture classifier, which reports
+    # hang-ups only once they are too long to be a hook-flash or pulse
+    gestures = HookGestureClassifier()
+    gestures.set_callback(post_gesture)
+    
+    def on_handset_edge(timestamp, state):
+        recorder.record_handset(state, timestamp)
+        gestures.feed(timestamp, state)
+    
+    keypad.set_callback(on_key)
+    handset.set_edge_callback(on_handset_edge)
+    
+    # Start watching for blocking calls on the event loop
+    watchdog.start()
+    
+    # Start scanning on the hardware thread
+    hardware.add_poller("handset", handset.poll)
+    hardware.add_poller("keypad", keypad.poll)
+    hardware.add_poller("hook_gestures", gestures.poll)
     
     # Create a handler factory that captures the handset, keypad, led, and speaker variables
     async def handler(websocket):
         await handle_client(websocket, handset, keypad, led, speaker)
     
-    async with websockets.serve(handler, "0.0.0.0", 8765):
-        logger.info(f"Server ready at ws://{local_ip}:8765")
+    async with contextlib.AsyncExitStack() as listeners:
+        await listeners.enter_async_context(websockets.serve(handler, host, port))
+        logger.info(f"Server ready at ws://{local_ip}:{port}")
+        if UNIX_SOCKET_PATH:
+            try:
+                await listeners.enter_async_context(serve_unix_socket(handler, UNIX_SOCKET_PATH))
+                logger.info(f"Server ready at unix:{UNIX_SOCKET_PATH}")
+            except (OSError, RuntimeError) as e:
+                # TCP clients are still served; the Unix socket is optional
+                logger.error(f"Could not serve on unix:{UNIX_SOCKET_PATH}: {e}")
         # Turn on LED to indicate server is running
-        led.on()
+        await hardware.submit(led.on)
+        hardware_state.update(led="on")
         await broadcast_event("led_state", {"state": "on"})
         await asyncio.Future()
 
@@ -288,4 +487,9 @@ if __name__ == "__main__":
         # Make sure to stop any playing ringtone
         kill_aplay()  # Kill immediately without async
     finally:
+        recorder.close()
+        if audio_output:
+            audio_output.close()
+        # No scan may touch the pins once they are released
+        hardware.stop(wait=True)
         GPIO.cleanup()
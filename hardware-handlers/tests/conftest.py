@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The handler modules are imported relative to hardware-handlers/, as when the server runs
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,41 @@
+import pytest
+
+from components.hook_gestures import HookGestureClassifier
+
+
+def run(edges, end):
+    """Feed (time, down) edges starting off-hook and return the events after flushing at end."""
+    classifier = HookGestureClassifier()
+    events = classifier.feed(0.0, False)[1:]  # Drop the initial off_hook
+    for timestamp, down in edges:
+        events += classifier.feed(timestamp, down)
+    return events + classifier.flush(end)
+
+
+def pulses(start, count, brk=0.06, make=0.04):
+    """Edges for count pulses at 10 pulses per second."""
+    edges = []
+    for i in range(count):
+        t = start + i * (brk + make)
+        edges += [(t, True), (t + brk, False)]
+    return edges
+
+
+@pytest.mark.parametrize("edges, end, expected", [
+    pytest.param([(1.0, True), (1.3, False)], 3.0, [("hook_flash", None)], id="hook-flash"),
+    pytest.param([(1.0, True)], 3.0, [("on_hook", None)], id="hang-up"),
+    pytest.param([(1.0, True), (2.5, False)], 3.0, [("on_hook", None), ("off_hook", None)],
+                 id="hang-up and pick up"),
+    pytest.param([(1.0, True), (1.005, False)], 3.0, [], id="contact bounce"),
+    pytest.param(pulses(1.0, 1, brk=0.05), 3.0, [("pulse_digit", "1")], id="digit 1"),
+    pytest.param(pulses(1.0, 5), 3.0, [("pulse_digit", "5")], id="digit 5"),
+    pytest.param(pulses(1.0, 10), 3.0, [("pulse_digit", "0")], id="digit 0"),
+    pytest.param(pulses(1.0, 3) + pulses(2.0, 2), 4.0, [("pulse_digit", "3"), ("pulse_digit", "2")],
+                 id="digits 3 then 2"),
+    pytest.param(pulses(1.0, 4) + [(2.0, True)], 4.0, [("pulse_digit", "4"), ("on_hook", None)],
+                 id="digit then hang-up"),
+    pytest.param(pulses(1.0, 3, brk=0.15, make=0.2), 4.0, [("pulse_digit", "3")], id="slow hand taps"),
+    pytest.param(pulses(1.0, 2), 1.3, [], id="gesture still open"),
+])
+def test_classify(edges, end, expected):
+    assert run(edges, end) == expected
@@ -21,7 +21,11 @@ dotenv.config();
 
 const OPENAI_REALTIME_SOCKET_SERVER =
   "wss://api.openai.com/v1/realtime?model=gpt-realtime";
-const HARDWARE_SOCKET_SERVER = "ws://localhost:8765";
+// Set HARDWARE_SOCKET_PATH to use the hardware server's Unix domain socket
+// instead of TCP loopback
+const HARDWARE_SOCKET_SERVER = process.env.HARDWARE_SOCKET_PATH
+  ? `ws+unix:${process.env.HARDWARE_SOCKET_PATH}:/`
+  : "ws://localhost:8765";
 
 let ws = null;
 let handsetWs = null;
@@ -192,6 +196,11 @@ function initHandsetWebSocket() {
   handsetWs.on("message", function message(data) {
     try {
       const event = JSON.parse(data.toString());
+      // The server sends its full cached state once on connect
+      if (event.event === "state_snapshot" && event.handset) {
+        event.event = "handset_state";
+        event.state = event.handset;
+      }
       if (event.event === "handset_state") {
         handsetState = event.state;
         if (event.state === "up") {